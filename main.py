@@ -1,3 +1,11 @@
+import logging
+import os
+
+# Optimizations run in worker threads, and a numba TBB pool started off the main thread
+# deadlocks at interpreter exit. Prefer OpenMP unless the user chose an order. Set before
+# numba is imported, spawned worker processes inherit it.
+os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp tbb workqueue")
+
 from src.config.parser import init_config
 from src.simulation import simulate_loadbalancer
 
@@ -5,6 +13,7 @@ def main():
     simulate_loadbalancer()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     init_config()
     main()
     
\ No newline at end of file
@@ -1,12 +1,16 @@
 import os
+import importlib.util
+from pathlib import Path
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 
+# Use the multithreaded pyarrow CSV reader when it is installed
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
 def load_metrics_from_dir(dir_path, algorithm_name):
     """Load all CSV files in a directory and label them with the algorithm name."""
-    csv_files = [os.path.join(dir_path, file) for file in os.listdir(dir_path) if file.endswith('.csv')]
-    dataframes = [pd.read_csv(file).assign(Algorithm=algorithm_name, Configuration=file.split('_conf')[1].split('.')[0]) for file in csv_files]
+    csv_files = Path(dir_path).glob('*.csv')
+    dataframes = [pd.read_csv(file, engine=CSV_ENGINE).assign(Algorithm=algorithm_name, Configuration=file.stem.split('_conf')[1]) for file in csv_files]
     return pd.concat(dataframes, ignore_index=True)
 
 def load_all_metrics(base_dir):
@@ -26,25 +30,25 @@ def plot_metrics_for_configs(metrics_df, metrics_to_plot):
         num_metrics = len(metrics_to_plot)
         cols = 2  # Number of columns in the grid
         rows = -(-num_metrics // cols)  # Ceiling division for rows
-        fig, axes = plt.subplots(rows, cols, figsize=(12, 5 * rows), dpi=100)
-        
+
+        # Aggregate every metric in a single groupby pass and plot them all at once
+        averages = config_data.groupby('Algorithm')[metrics_to_plot].mean()
+        axes = averages.plot(subplots=True, layout=(rows, cols), kind='bar', figsize=(12, 5 * rows), legend=False)
+        fig = axes.flat[0].get_figure()
+
         # Set a title for the entire window
         fig.suptitle(f'Metrics for Configuration {config}', fontsize=16, y=1.02)
-        
-        axes = axes.flatten() if isinstance(axes, np.ndarray) else [axes]
-        
-        for i, metric in enumerate(metrics_to_plot):
-            ax = axes[i]
-            config_data.groupby('Algorithm')[metric].mean().plot(kind='bar', ax=ax)
+
+        for ax, metric in zip(axes.flat, metrics_to_plot):
             ax.set_title(f'{metric}', fontsize=12)
             ax.set_ylabel(metric, fontsize=10)
             ax.set_xlabel('Algorithm', fontsize=10)
             ax.tick_params(axis='both', labelsize=10)
             ax.grid(axis='y', linestyle='--', alpha=0.7)
-        
+
         # Hide unused subplots
-        for i in range(len(metrics_to_plot), len(axes)):
-            fig.delaxes(axes[i])
+        for ax in axes.flat[num_metrics:]:
+            fig.delaxes(ax)
         
         # Adjust spacing between rows and overall layout
         plt.subplots_adjust(hspace=0.5, wspace=0.6, top=0.9)
@@ -1,6 +1,12 @@
 import numpy as np
+from src.algorithms.metaheuristic import kernels
 from src.algorithms.metaheuristic.metaheuristic_abstract import Metaheuristic
 
+try:
+    import cupy
+except ImportError:  # cupy is optional, GWO runs on the CPU without it
+    cupy = None
+
 class GrayWolfOptimization(Metaheuristic):
     """
     Gray Wolf Optimization (GWO) Algorithm for task-to-VM allocation optimization.
@@ -18,6 +24,32 @@ class GrayWolfOptimization(Metaheuristic):
         self.a_max = config.get("a_max", 2)
         self.max_iterations = config.get("iterations", 50)
         self.convergence_threshold = config.get("convergence_threshold", 1e-6)
+        self.patience = config.get("patience", 10)  # Iterations without improvement before stopping
+        self.device = config.get("device", "cpu")  # "cpu", "cuda" or "auto"
+        self.gpu_min_size = config.get("gpu_min_size", 1 << 20)  # Wolves x tasks before "auto" picks the GPU
+        self.xp = np
+        self.gpu_rng = None
+
+    def select_array_module(self, num_tasks):
+        """
+        Selects NumPy or CuPy for the next optimization run.
+
+        Args:
+            num_tasks (int): Number of tasks to allocate.
+
+        Returns:
+            module: The selected array module.
+        """
+        use_gpu = self.device == "cuda" or (
+            self.device == "auto" and cupy is not None and self.num_wolves * num_tasks >= self.gpu_min_size
+        )
+        if use_gpu and cupy is None:
+            raise ImportError("GWO device 'cuda' requires cupy to be installed.")
+
+        self.xp = cupy if use_gpu else np
+        if use_gpu and self.gpu_rng is None:
+            self.gpu_rng = cupy.random.default_rng(self.config.get("seed"))
+        return self.xp
 
     def initialize_population(self, tasks, vms):
         """
@@ -30,113 +62,117 @@ class GrayWolfOptimization(Metaheuristic):
         Returns:
             np.ndarray: Initial population as a matrix of size (num_wolves, len(tasks)).
         """
-        return np.random.randint(0, len(vms), size=(self.num_wolves, len(tasks)))
+        return self.rng.integers(0, len(vms), size=(self.num_wolves, len(tasks)), dtype=self.index_dtype(len(vms)))
 
-    def evaluate_fitness(self, population, tasks, vms):
+    def evaluate_fitness(self, population, tasks_cpu, capacities):
         """
         Evaluates the fitness of the population.
 
         Args:
             population (np.ndarray): Current population of wolves.
-            tasks (list): List of tasks.
-            vms (list): List of VMs.
+            tasks_cpu (np.ndarray): CPU demand of each task.
+            capacities (np.ndarray): Free CPU capacity of each VM.
 
         Returns:
             np.ndarray: Fitness values for the population.
         """
-        fitness_scores = []
-        for allocation in population:
-            vm_utilization = [0] * len(vms)
-
-            # Calculate VM utilization
-            for task_idx, vm_idx in enumerate(allocation):
-                task_cpu = tasks[task_idx] if isinstance(tasks[task_idx], (int, float)) else tasks[task_idx].cpu
-                vm_utilization[vm_idx] += task_cpu
-
-            # Penalize overloaded VMs
-            overload_penalty = sum(
-                max(0, util - vms[vm_idx].free_cpu_percent() * vms[vm_idx].cpu_core)
-                for vm_idx, util in enumerate(vm_utilization)
-            )
+        if self.xp is not np:
+            return self._allocation_penalty(population, tasks_cpu, capacities, 1.0, self.xp)
+        return self.allocation_penalty(population, tasks_cpu, capacities)
 
-            # Load balance penalty
-            ideal_load = sum(vm_utilization) / len(vms)
-            load_balance_penalty = sum((util - ideal_load) ** 2 for util in vm_utilization)
-
-            # Combine penalties
-            fitness = load_balance_penalty + overload_penalty
-            fitness_scores.append(fitness)
-
-        return np.array(fitness_scores)
-
-
-    def update_population(self, population, fitness_scores, tasks, vms, iteration):
+    def update_population(self, population, new_population, fitness_scores, tasks, vms, iteration):
         """
         Updates the population based on the GWO logic.
 
         Args:
             population (np.ndarray): Current population of wolves.
+            new_population (np.ndarray): Buffer receiving the updated population.
             fitness_scores (np.ndarray): Fitness values for the population.
             tasks (list): List of tasks.
             vms (list): List of VMs.
             iteration (int): Current iteration number.
 
         Returns:
-            np.ndarray: Updated population.
+            np.ndarray: Updated population (`new_population`).
         """
+        xp = self.xp
+        rng = self.rng if xp is np else self.gpu_rng
         a = self.a_max * (1 - iteration / self.max_iterations)
 
         # Identify alpha, beta, and delta wolves
-        sorted_indices = np.argsort(fitness_scores)
-        alpha, beta, delta = population[sorted_indices[0]], population[sorted_indices[1]], population[sorted_indices[2]]
-
-        new_population = np.copy(population)
-        for i, wolf in enumerate(population):
-            for j in range(len(tasks)):
-                r1, r2 = np.random.random(), np.random.random()
-                A1, C1 = 2 * a * r1 - a, 2 * r2
-                D_alpha = abs(C1 * alpha[j] - wolf[j])
-                X1 = alpha[j] - A1 * D_alpha
-
-                r1, r2 = np.random.random(), np.random.random()
-                A2, C2 = 2 * a * r1 - a, 2 * r2
-                D_beta = abs(C2 * beta[j] - wolf[j])
-                X2 = beta[j] - A2 * D_beta
-
-                r1, r2 = np.random.random(), np.random.random()
-                A3, C3 = 2 * a * r1 - a, 2 * r2
-                D_delta = abs(C3 * delta[j] - wolf[j])
-                X3 = delta[j] - A3 * D_delta
-
-                # Update wolf position
-                new_population[i][j] = (X1 + X2 + X3) / 3
-
-        return np.clip(new_population, 0, len(vms) - 1).astype(int)
-
-    def optimize(self, tasks, vms):
+        leader_indices = xp.argpartition(fitness_scores, 2)[:3]
+        leader_indices = leader_indices[xp.argsort(fitness_scores[leader_indices])]
+        alpha, beta, delta = population[leader_indices[0]], population[leader_indices[1]], population[leader_indices[2]]
+
+        # One random draw per leader, wolf and task
+        r1 = rng.random((3,) + population.shape, dtype=np.float32)
+        r2 = rng.random((3,) + population.shape, dtype=np.float32)
+
+        if self.use_numba and xp is np:
+            kernels.gwo_update(population, new_population, alpha, beta, delta, a, len(vms) - 1, r1, r2)
+            return new_population
+
+        leaders = xp.stack([alpha, beta, delta])[:, None, :]
+
+        # Reuse the random buffers for every intermediate: A = 2a*r1 - a lives in r1,
+        # D = |C*leader - wolf| and then X = leader - A*D live in r2
+        xp.multiply(r1, 2 * a, out=r1)
+        xp.subtract(r1, a, out=r1)
+        xp.multiply(r2, 2, out=r2)
+        xp.multiply(r2, leaders, out=r2)
+        xp.subtract(r2, population, out=r2)
+        xp.fabs(r2, out=r2)
+        xp.multiply(r1, r2, out=r2)
+        xp.subtract(leaders, r2, out=r2)
+
+        # Update wolf positions
+        new_population[...] = xp.clip(r2.mean(axis=0), 0, len(vms) - 1)
+        return new_population
+
+    def optimize(self, tasks, vms, capacities=None):
         """
         Runs the GWO optimization.
 
         Args:
             tasks (list): List of tasks.
             vms (list): List of VMs.
+            capacities (np.ndarray, optional): Precomputed free CPU capacity of each VM.
+                Computed from `vms` if None.
 
         Returns:
             np.ndarray: Best allocation found.
         """
-        population = self.initialize_population(tasks, vms)
+        xp = self.select_array_module(len(tasks))
+        tasks_cpu = xp.asarray(self.task_demands(tasks))
+        capacities = xp.asarray(self.vm_capacities(vms) if capacities is None else capacities)
+        population = xp.asarray(self.initialize_population(tasks, vms))
+        new_population = xp.empty_like(population)
         best_fitness = float('inf')
         best_allocation = None
+        stale_iterations = 0
 
         for iteration in range(self.max_iterations):
-            fitness_scores = self.evaluate_fitness(population, tasks, vms)
-            if min(fitness_scores) < best_fitness:
-                best_fitness = min(fitness_scores)
-                best_allocation = population[np.argmin(fitness_scores)]
+            fitness_scores = self.evaluate_fitness(population, tasks_cpu, capacities)
+            best_idx = int(xp.argmin(fitness_scores))
+            iteration_best = float(fitness_scores[best_idx])
+
+            # Count iterations that fail to improve the best fitness meaningfully
+            if iteration_best < best_fitness - self.convergence_threshold:
+                stale_iterations = 0
+            else:
+                stale_iterations += 1
+
+            if iteration_best < best_fitness:
+                best_fitness = iteration_best
+                best_allocation = population[best_idx].copy()
 
-            if best_fitness < self.convergence_threshold:
+            if best_fitness < self.convergence_threshold or stale_iterations >= self.patience:
                 break
 
-            population = self.update_population(population, fitness_scores, tasks, vms, iteration)
+            # Write into the spare buffer and swap instead of allocating a new population
+            self.update_population(population, new_population, fitness_scores, tasks, vms, iteration)
+            population, new_population = new_population, population
 
+        if xp is not np:
+            best_allocation = cupy.asnumpy(best_allocation)
         return best_allocation
@@ -0,0 +1,77 @@
+import numpy as np
+
+from src.numba_support import njit, prange
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def allocation_penalty(population, tasks_cpu, capacities, balance_weight):
+    """
+    Computes the overload penalty plus the weighted load balance penalty of each allocation.
+
+    Runs without the GIL so population chunks can be evaluated on parallel threads.
+
+    Args:
+        population (np.ndarray): Task-to-VM allocations of shape (pop_size, num_tasks).
+        tasks_cpu (np.ndarray): CPU demand of each task.
+        capacities (np.ndarray): Free CPU capacity of each VM.
+        balance_weight (float): Weight of the load balance penalty.
+
+    Returns:
+        np.ndarray: Penalty of each allocation.
+    """
+    pop_size, num_tasks = population.shape
+    num_vms = capacities.shape[0]
+    out = np.empty(pop_size)
+    loads = np.empty(num_vms)
+    for i in range(pop_size):
+        loads[:] = 0.0
+        for d in range(num_tasks):
+            loads[population[i, d]] += tasks_cpu[d]
+
+        total_load = 0.0
+        overload_penalty = 0.0
+        for v in range(num_vms):
+            total_load += loads[v]
+            if loads[v] > capacities[v]:
+                overload_penalty += loads[v] - capacities[v]
+
+        ideal_load = total_load / num_vms
+        load_balance_penalty = 0.0
+        for v in range(num_vms):
+            load_balance_penalty += (loads[v] - ideal_load) ** 2
+
+        out[i] = overload_penalty + balance_weight * load_balance_penalty
+    return out
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def gwo_update(population, out, alpha, beta, delta, a, upper, r1, r2):
+    """
+    Moves every wolf towards the alpha, beta and delta wolves.
+
+    Args:
+        population (np.ndarray): Current task-to-VM allocations.
+        out (np.ndarray): Output buffer receiving the updated allocations.
+        alpha (np.ndarray): Best allocation.
+        beta (np.ndarray): Second best allocation.
+        delta (np.ndarray): Third best allocation.
+        a (float): Current value of the GWO exploration coefficient.
+        upper (int): Highest valid VM index.
+        r1 (np.ndarray): Uniform draws for the A coefficients, shape (3, num_wolves, num_tasks).
+        r2 (np.ndarray): Uniform draws for the C coefficients, shape (3, num_wolves, num_tasks).
+    """
+    num_wolves, num_tasks = population.shape
+    for i in prange(num_wolves):
+        for d in range(num_tasks):
+            wolf = population[i, d]
+            position = 0.0
+            for k, leader in enumerate((alpha[d], beta[d], delta[d])):
+                A = 2 * a * r1[k, i, d] - a
+                C = 2 * r2[k, i, d]
+                position += leader - A * abs(C * leader - wolf)
+            position /= 3
+            if position < 0:
+                position = 0
+            elif position > upper:
+                position = upper
+            out[i, d] = int(position)
@@ -1,4 +1,13 @@
+import os
+import multiprocessing
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from src.algorithms.metaheuristic import kernels
+from src.numba_support import NUMBA_AVAILABLE
+
+MIN_CHUNK_CELLS = 1 << 16  # Smallest population chunk (rows x tasks) worth a worker thread
 
 
 class Metaheuristic(ABC):
@@ -6,6 +15,8 @@ class Metaheuristic(ABC):
     Abstract base class for metaheuristic algorithms.
     """
 
+    maximize_fitness = False  # Whether a higher fitness score is better
+
     def __init__(self, config):
         """
         Initializes the metaheuristic algorithm with its configuration.
@@ -14,6 +25,141 @@ class Metaheuristic(ABC):
             config (dict): Algorithm-specific configuration.
         """
         self.config = config
+        self.rng = np.random.default_rng(config.get("seed"))
+        self.use_numba = NUMBA_AVAILABLE and config.get("use_numba", True)
+        self.num_workers = config.get("num_workers", 1)
+        self._pool = ThreadPoolExecutor(max_workers=self.num_workers) if self.num_workers > 1 else None
+
+        # Worker processes for multi-start runs, started once and reused for every batch
+        self.num_restarts = config.get("num_restarts", 1)
+        self._restart_pool = None
+        if self.num_restarts > 1:
+            self._restart_pool = ProcessPoolExecutor(
+                max_workers=min(self.num_restarts, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def __del__(self):
+        for name in ("_pool", "_restart_pool"):
+            pool = getattr(self, name, None)
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+    @staticmethod
+    def task_demands(tasks):
+        """
+        Converts tasks into a vector of CPU demands.
+
+        Args:
+            tasks (list or np.ndarray): CPU utilizations or Task objects.
+
+        Returns:
+            np.ndarray: CPU demand of each task.
+        """
+        if isinstance(tasks, np.ndarray) and tasks.dtype != object:
+            return tasks.astype(np.float32, copy=False)  # Batches streamed from the task queue
+        return np.fromiter((getattr(task, "cpu_demand", task) for task in tasks), dtype=np.float32, count=len(tasks))
+
+    @staticmethod
+    def vm_capacities(vms):
+        """
+        Computes the free CPU capacity of each VM.
+
+        Args:
+            vms (list): List of VMs.
+
+        Returns:
+            np.ndarray: Free CPU capacity of each VM.
+        """
+        return np.fromiter((vm.free_cpu_capacity() for vm in vms), dtype=np.float32, count=len(vms))
+
+    @staticmethod
+    def index_dtype(num_vms):
+        """
+        Returns the smallest integer dtype able to hold every VM index.
+
+        Args:
+            num_vms (int): Number of VMs.
+
+        Returns:
+            type: np.int16 or np.int32.
+        """
+        return np.int16 if num_vms <= np.iinfo(np.int16).max + 1 else np.int32
+
+    @staticmethod
+    def vm_loads(population, tasks_cpu, num_vms, xp=np):
+        """
+        Sums the CPU demand placed on every VM by each candidate allocation.
+
+        Args:
+            population (np.ndarray): Candidate allocations of shape (pop_size, num_tasks).
+            tasks_cpu (np.ndarray): CPU demand of each task.
+            num_vms (int): Number of VMs.
+            xp (module): Array module holding the arrays (numpy or cupy).
+
+        Returns:
+            np.ndarray: VM loads of shape (pop_size, num_vms).
+        """
+        population = xp.asarray(population)
+        pop_size, num_tasks = population.shape
+
+        # Offset each candidate's VM indices into its own block so one bincount covers all rows
+        offsets = xp.arange(pop_size)[:, None] * num_vms
+        flat_idx = (population + offsets).ravel()
+        weights = xp.broadcast_to(tasks_cpu, (pop_size, num_tasks)).ravel()
+        loads = xp.bincount(flat_idx, weights=weights, minlength=pop_size * num_vms)
+        return loads.reshape(pop_size, num_vms)
+
+    def map_population(self, func, population, *args):
+        """
+        Applies a function to chunks of the population on the worker thread pool.
+
+        Populations too small to give every chunk at least `MIN_CHUNK_CELLS` cells are
+        evaluated inline with a single call, where the pool overhead would dominate.
+
+        Args:
+            func (callable): Function taking a population chunk followed by `args`.
+            population (np.ndarray): Candidate solutions.
+            *args: Extra arguments passed to `func`.
+
+        Returns:
+            np.ndarray: Concatenated per-candidate results.
+        """
+        num_chunks = min(self.num_workers, population.size // MIN_CHUNK_CELLS, len(population))
+        if num_chunks <= 1:
+            return func(population, *args)
+        chunks = np.array_split(population, num_chunks)
+        return np.concatenate(list(self._pool.map(lambda chunk: func(chunk, *args), chunks)))
+
+    def allocation_penalty(self, population, tasks_cpu, capacities, balance_weight=1.0):
+        """
+        Computes the overload penalty plus the weighted load balance penalty of each allocation.
+
+        Args:
+            population (np.ndarray): Candidate allocations of shape (pop_size, num_tasks).
+            tasks_cpu (np.ndarray): CPU demand of each task.
+            capacities (np.ndarray): Free CPU capacity of each VM.
+            balance_weight (float): Weight of the load balance penalty.
+
+        Returns:
+            np.ndarray: Penalty of each allocation.
+        """
+        penalty = kernels.allocation_penalty if self.use_numba else self._allocation_penalty
+        return self.map_population(penalty, population, tasks_cpu, capacities, balance_weight)
+
+    @classmethod
+    def _allocation_penalty(cls, population, tasks_cpu, capacities, balance_weight, xp=np):
+        loads = cls.vm_loads(population, tasks_cpu, len(capacities), xp)
+
+        # Penalize overloaded VMs
+        overload_penalty = xp.maximum(0, loads - capacities).sum(axis=1)
+        if not balance_weight:
+            return overload_penalty
+
+        # Load balance penalty
+        ideal_load = loads.mean(axis=1, keepdims=True)
+        load_balance_penalty = ((loads - ideal_load) ** 2).sum(axis=1)
+        return overload_penalty + balance_weight * load_balance_penalty
 
     @abstractmethod
     def initialize_population(self, tasks, vms):
@@ -27,14 +173,14 @@ class Metaheuristic(ABC):
         pass
 
     @abstractmethod
-    def evaluate_fitness(self, population, tasks, vms):
+    def evaluate_fitness(self, population, tasks_cpu, capacities):
         """
         Evaluates the fitness of the population.
 
         Args:
             population (list): List of candidate solutions.
-            tasks (list): List of CPU utilization tasks.
-            vms (list): List of VMs with their free CPU capacities.
+            tasks_cpu (np.ndarray): CPU demand of each task, see `task_demands`.
+            capacities (np.ndarray): Free CPU capacity of each VM, see `vm_capacities`.
         """
         pass
 
@@ -49,22 +195,68 @@ class Metaheuristic(ABC):
         """
         pass
 
-    def optimize(self, tasks, vms):
+    def optimize(self, tasks, vms, capacities=None):
         """
         Runs the optimization process.
 
         Args:
             tasks (list): List of CPU utilization tasks.
             vms (list): List of VMs with their free CPU capacities.
+            capacities (np.ndarray, optional): Precomputed free CPU capacity of each VM.
+                Computed from `vms` if None.
 
         Returns:
-            list: Optimized task-to-VM mapping.
+            np.ndarray: Optimized task-to-VM mapping.
         """
+        tasks_cpu = self.task_demands(tasks)
+        capacities = self.vm_capacities(vms) if capacities is None else capacities
         population = self.initialize_population(tasks, vms)
         for _ in range(self.config.get("iterations", 50)):
-            fitness_scores = self.evaluate_fitness(population, tasks, vms)
+            fitness_scores = self.evaluate_fitness(population, tasks_cpu, capacities)
             self.update_population(population, fitness_scores)
 
-        # Return the best solution
-        best_solution = max(population, key=lambda p: self.evaluate_fitness([p], tasks, vms)[0])
-        return best_solution
+        # Return the best solution from a single batched evaluation
+        fitness_scores = self.evaluate_fitness(population, tasks_cpu, capacities)
+        best_idx = np.argmax(fitness_scores) if self.maximize_fitness else np.argmin(fitness_scores)
+        return population[int(best_idx)]
+
+    def parallel_optimize(self, tasks, vms, capacities=None):
+        """
+        Runs `num_restarts` independent optimizations on the worker processes and keeps the
+        best allocation. Runs a single `optimize` in this process when restarts are disabled.
+
+        Args:
+            tasks (list): List of CPU utilization tasks.
+            vms (list): List of VMs with their free CPU capacities.
+            capacities (np.ndarray, optional): Precomputed free CPU capacity of each VM.
+
+        Returns:
+            np.ndarray: Best task-to-VM mapping across all runs.
+        """
+        if self._restart_pool is None:
+            return self.optimize(tasks, vms, capacities)
+
+        # Drawn from this instance's generator, so successive batches explore new streams
+        seeds = self.rng.integers(2**32, size=self.num_restarts)
+        if capacities is None:
+            capacities = self.vm_capacities(vms)
+        # Workers only need the VM count once capacities are known, so no VM is pickled
+        tasks_cpu = self.task_demands(tasks)
+        futures = [
+            self._restart_pool.submit(type(self)._restart_worker, self.config, tasks_cpu, len(vms), capacities, seed)
+            for seed in seeds
+        ]
+        results = [future.result() for future in futures]
+
+        pick = max if self.maximize_fitness else min
+        _, best_allocation = pick(results, key=lambda result: result[0])
+        return best_allocation
+
+    @classmethod
+    def _restart_worker(cls, config, tasks, num_vms, capacities, seed):
+        # Parallelism comes from the restarts, each run uses a single thread
+        algorithm = cls(dict(config, seed=int(seed), num_restarts=1, num_workers=1))
+        vm_indices = range(num_vms)  # Stands in for the VMs, optimize only takes their count
+        allocation = np.asarray(algorithm.optimize(tasks, vm_indices, capacities))
+        fitness = algorithm.evaluate_fitness(allocation[None, :], algorithm.task_demands(tasks), capacities)[0]
+        return float(fitness), allocation
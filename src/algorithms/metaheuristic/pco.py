@@ -1,15 +1,13 @@
-import random
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 from src.algorithms.metaheuristic.metaheuristic_abstract import Metaheuristic
-from src.cloud.task import Task
 
 class PlantCompetitionOptimization(Metaheuristic):
     """
     Plant Competition Optimization (PCO) Algorithm for CPU utilization.
     """
 
+    maximize_fitness = True
+
     def __init__(self, config):
         """
         Initializes the PCO algorithm.
@@ -32,82 +30,70 @@ class PlantCompetitionOptimization(Metaheuristic):
             vms (list): List of VMs with their free CPU capacities.
 
         Returns:
-            list: Initial population of task-to-VM allocations.
+            np.ndarray: Initial population of task-to-VM allocations of size (num_plants, len(tasks)).
         """
-        population = []
-        for _ in range(self.config["num_plants"]):
-            allocation = np.random.choice(range(len(vms)), size=len(tasks))
-            population.append(allocation)
-        return population
+        return self.rng.integers(0, len(vms), size=(self.config["num_plants"], len(tasks)), dtype=self.index_dtype(len(vms)))
 
-    def evaluate_fitness(self, population, tasks, vms):
+    def evaluate_fitness(self, population, tasks_cpu, capacities):
         """
         Evaluates the fitness of each allocation.
 
         Args:
-            population (list): List of task-to-VM allocations.
-            tasks (list): List of CPU utilization tasks.
-            vms (list): List of VM objects with their free CPU capacities.
+            population (np.ndarray): Task-to-VM allocations.
+            tasks_cpu (np.ndarray): CPU demand of each task.
+            capacities (np.ndarray): Free CPU capacity of each VM.
 
         Returns:
-            list: Fitness scores for each allocation.
+            np.ndarray: Fitness scores for each allocation.
         """
-        fitness_scores = []
-        for allocation in population:
-            vm_loads = [0] * len(vms)
-            for task, vm_idx in zip(tasks, allocation):
-                vm_loads[vm_idx] += task
-
-            # Calculate fitness: Penalize overloaded VMs
-            overload_penalty = sum(
-                max(0, load - vms[vm_idx].free_cpu_percent() * vms[vm_idx].cpu_core)  # Correctly calculate free CPU
-                for vm_idx, load in enumerate(vm_loads)
-            )
-            fitness = -overload_penalty  # Minimize overload
-            fitness_scores.append(fitness)
-        return fitness_scores
+        # Penalize overloaded VMs only, higher fitness is better
+        return -self.allocation_penalty(population, tasks_cpu, capacities, balance_weight=0)
 
     def update_population(self, population, fitness_scores, vms):
         """
         Updates the plant population by selecting and mutating top-performing allocations.
 
         Args:
-            population (list): List of task-to-VM allocations.
-            fitness_scores (list): Fitness scores of the allocations.
+            population (np.ndarray): Task-to-VM allocations, updated in place.
+            fitness_scores (np.ndarray): Fitness scores of the allocations.
+            vms (list): List of VMs.
         """
-        # Ensure fitness_scores are scalar and not numpy arrays
-        fitness_scores = [float(score) for score in fitness_scores]
+        fitness_scores = np.asarray(fitness_scores, dtype=float)
+        num_plants, num_tasks = population.shape
+        num_top = num_plants // 2
 
-        # Select top-performing allocations
-        sorted_population = [x for _, x in sorted(zip(fitness_scores, population), key=lambda pair: pair[0], reverse=True)]
-        top_population = sorted_population[: len(sorted_population) // 2]
+        # Select top-performing allocations without sorting the whole population
+        top_idx = np.argpartition(-fitness_scores, num_top)[:num_top]
+        top_population = population[top_idx]
 
-        # Reproduce and mutate
-        while len(top_population) < len(population):
-            parent = random.choice(top_population)
-            offspring = parent[:]
-            mutate_idx = np.random.randint(len(parent))
-            offspring[mutate_idx] = np.random.randint(len(vms))  # Mutate task-to-VM mapping
-            top_population.append(offspring)
+        # Reproduce and mutate one task-to-VM mapping per offspring
+        num_children = num_plants - num_top
+        children = top_population[self.rng.integers(0, num_top, size=num_children)]
+        mutate_idx = self.rng.integers(0, num_tasks, size=num_children)
+        children[np.arange(num_children), mutate_idx] = self.rng.integers(0, len(vms), size=num_children)
 
-        # Update population
-        population[:] = top_population
+        # Update population in place, without stacking a new array
+        population[:num_top] = top_population
+        population[num_top:] = children
 
-
-    def optimize(self, tasks, vms):
+    def optimize(self, tasks, vms, capacities=None):
         """
         Runs the PCO algorithm to optimize task allocation.
 
         Args:
             tasks (list): List of CPU utilization tasks.
             vms (list): List of VMs with their free CPU capacities.
+            capacities (np.ndarray, optional): Precomputed free CPU capacity of each VM.
+                Computed from `vms` if None.
 
         Returns:
             list: Optimized task-to-VM mapping.
         """
+        tasks_cpu = self.task_demands(tasks)
+        capacities = self.vm_capacities(vms) if capacities is None else capacities
         population = self.initialize_population(tasks, vms)
         for iteration in range(self.config.get("iterations", 50)):
-            fitness_scores = self.evaluate_fitness(population, tasks, vms)
+            fitness_scores = self.evaluate_fitness(population, tasks_cpu, capacities)
             self.update_population(population, fitness_scores, vms)
 
             # Track best fitness
@@ -122,6 +108,8 @@ class PlantCompetitionOptimization(Metaheuristic):
         """
         Plots the convergence of the algorithm.
         """
+        import matplotlib.pyplot as plt  # Only needed for plotting, keep it off the import path
+
         plt.plot(self.best_fitness, 'b*-', linewidth=1, markeredgecolor='r', markersize=5)
         plt.xlabel('Iteration')
         plt.ylabel('Fitness Value')
@@ -17,77 +17,54 @@ class ParticleSwarmOptimization(Metaheuristic):
         self.convergence_threshold = config.get("convergence_threshold", 1e-6)
 
     def initialize_population(self, tasks, vms):
-        positions = np.random.randint(0, len(vms), size=(self.num_particles, len(tasks)))
-        velocities = np.random.uniform(
-            self.velocity_clamp[0], self.velocity_clamp[1], size=(self.num_particles, len(tasks))
-        )
+        positions = self.rng.integers(0, len(vms), size=(self.num_particles, len(tasks)), dtype=self.index_dtype(len(vms)))
+        low, high = self.velocity_clamp
+        velocities = low + (high - low) * self.rng.random((self.num_particles, len(tasks)), dtype=np.float32)
         return positions, velocities
 
-    def evaluate_fitness(self, population, tasks, vms):
+    def evaluate_fitness(self, population, tasks_cpu, capacities):
         """
         Evaluates the fitness of each allocation.
 
         Args:
             population (ndarray): Array of task-to-VM allocations.
-            tasks (list): List of CPU utilization tasks.
-            vms (list): List of VMs with their free CPU capacities.
+            tasks_cpu (ndarray): CPU demand of each task.
+            capacities (ndarray): Free CPU capacity of each VM.
 
         Returns:
             ndarray: Fitness scores for each allocation.
         """
-        fitness_scores = []
-        for allocation in population:
-            vm_utilization = [0] * len(vms)
-
-            # Calculate VM utilization
-            for task_idx, vm_idx in enumerate(allocation):
-                task_cpu = tasks[task_idx] if isinstance(tasks[task_idx], (int, float)) else tasks[task_idx].cpu
-                vm_utilization[vm_idx] += task_cpu
-
-            # Check for overload and penalize
-            overload_penalty = sum(
-                max(0, utilization - vms[vm_idx].free_cpu_percent() * vms[vm_idx].cpu_core)
-                for vm_idx, utilization in enumerate(vm_utilization)
-            )
-
-            # Ideal load balance calculation
-            ideal_load = sum(vm_utilization) / len(vms)
-            load_balance_penalty = sum((util - ideal_load) ** 2 for util in vm_utilization)
-
-            # Fitness score combines penalties
-            fitness = load_balance_penalty + overload_penalty
-            fitness_scores.append(fitness)
-
-        return np.array(fitness_scores)
-
-
-    def update_population(self, positions, velocities, personal_best_positions, global_best_position):
-        for i in range(self.num_particles):
-            r1, r2 = np.random.random(), np.random.random()
-            velocities[i] = (
-                self.inertia_weight * velocities[i]
-                + self.cognitive_weight * r1 * (personal_best_positions[i] - positions[i])
-                + self.social_weight * r2 * (global_best_position - positions[i])
-            )
-            velocities[i] = np.clip(velocities[i], *self.velocity_clamp)
+        return self.allocation_penalty(population, tasks_cpu, capacities)
+
+    def update_population(self, positions, velocities, personal_best_positions, global_best_position, num_vms):
+        r1 = self.rng.random(positions.shape, dtype=np.float32)
+        r2 = self.rng.random(positions.shape, dtype=np.float32)
+        velocities = np.clip(
+            self.inertia_weight * velocities
+            + self.cognitive_weight * r1 * (personal_best_positions - positions)
+            + self.social_weight * r2 * (global_best_position - positions),
+            *self.velocity_clamp
+        )
 
-            # Update positions with explicit casting to int
-            positions[i] = np.clip(positions[i] + velocities[i], 0, len(positions[0]) - 1).astype(int)
+        # Update positions with explicit casting to int
+        positions = np.clip(positions + velocities, 0, num_vms - 1).astype(positions.dtype)
 
         return positions, velocities
 
-    def optimize(self, tasks, vms):
+    def optimize(self, tasks, vms, capacities=None):
+        tasks_cpu = self.task_demands(tasks)
+        capacities = self.vm_capacities(vms) if capacities is None else capacities
         positions, velocities = self.initialize_population(tasks, vms)
         personal_best_positions = np.copy(positions)
-        personal_best_scores = self.evaluate_fitness(positions, tasks, vms)
+        personal_best_scores = self.evaluate_fitness(positions, tasks_cpu, capacities)
         global_best_position = personal_best_positions[np.argmin(personal_best_scores)]
         global_best_score = min(personal_best_scores)
 
         for iteration in range(self.max_iterations):
             positions, velocities = self.update_population(
-                positions, velocities, personal_best_positions, global_best_position
+                positions, velocities, personal_best_positions, global_best_position, len(vms)
             )
-            fitness_scores = self.evaluate_fitness(positions, tasks, vms)
+            fitness_scores = self.evaluate_fitness(positions, tasks_cpu, capacities)
 
             for i in range(self.num_particles):
                 if fitness_scores[i] < personal_best_scores[i]:
@@ -2,6 +2,7 @@ import time
 
 class Task:
     task_counter = 0  # Static counter for auto-incrementing Task IDs
+    __slots__ = ("task_id", "cpu_demand", "memory_demand", "execution_time", "start_time", "end_time")
 
     def __init__(self, cpu_demand, memory_demand=0, execution_time=1):
         Task.task_counter += 1
@@ -10,7 +11,7 @@ class Task:
         self.memory_demand = memory_demand or 0
         # self.execution_time = execution_time * cpu_demand  # Time required to execute (seconds)
         self.execution_time = execution_time * self.categorize_execution_time(cpu_demand)  # Time required to execute (seconds)
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.end_time = self.start_time + self.execution_time  # Calculate the end time
 
     # Assign execution time categories based on CPU utilization
@@ -24,4 +25,4 @@ class Task:
 
     def is_complete(self):
         """Checks if the task is complete."""
-        return time.time() >= self.end_time if self.end_time else False
+        return time.monotonic() >= self.end_time if self.end_time else False
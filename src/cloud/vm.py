@@ -1,5 +1,12 @@
+import logging
+import math
+import time
+
+import numpy as np
 from src.cloud.task import Task
 
+logger = logging.getLogger(__name__)
+
 class VM:
     max_cpu_utilization = 0.9
     vm_counter = 0
@@ -16,17 +23,41 @@ class VM:
         self.total_executed_tasks = 0
         self.executed_tasks_interval = 0
         self.total_executed_time = 0
+        self._cpu_usage = 0  # CPU demand of the running tasks
+        self._end_time = 0  # Latest end time of any task allocated to this VM
+        self._next_expiry = math.inf  # Earliest end time among the running tasks
 
     def cpu_usage_percent(self):
-        cpu_usage = 0
-        for task in self.tasks:
-            if task.is_complete():
-                self.tasks.remove(task)
-                continue
-            else:
-                cpu_usage += task.cpu_demand
+        """
+        Returns the CPU demand of the tasks still running on this VM.
+
+        The usage is kept as a running total. The task list is only walked, to drop
+        completed tasks and recompute the total, once the earliest end time has passed.
 
-        return cpu_usage
+        Returns:
+            float: Sum of the CPU demands of the running tasks.
+        """
+        now = time.monotonic()
+        if now >= self._next_expiry:
+            self.tasks[:] = [task for task in self.tasks if task.end_time > now]
+            self._cpu_usage = sum(task.cpu_demand for task in self.tasks)
+            self._next_expiry = min((task.end_time for task in self.tasks), default=math.inf)
+
+        return self._cpu_usage
+
+    def _track_tasks(self, tasks):
+        """
+        Adds newly allocated tasks to the running aggregates.
+
+        Args:
+            tasks (list): Tasks just appended to `self.tasks`.
+        """
+        if not tasks:
+            return
+        self._cpu_usage += sum(task.cpu_demand for task in tasks)
+        self._end_time = max(self._end_time, max(task.end_time for task in tasks))
+        self._next_expiry = min(self._next_expiry, min(task.end_time for task in tasks))
+        self.total_executed_time += sum(task.execution_time for task in tasks)
 
     def free_cpu_percent(self):
         """
@@ -39,6 +70,18 @@ class VM:
 
         return self.max_cpu_utilization - cpu_usage
 
+    def free_cpu_capacity(self):
+        """
+        Calculates the free CPU capacity across all cores of the VM.
+
+        The value changes as tasks complete, so callers should snapshot it once per
+        optimization run rather than cache it on the VM.
+
+        Returns:
+            float: Free CPU percentage multiplied by the number of cores.
+        """
+        return self.free_cpu_percent() * self.cpu_core
+
     def free_memory(self):
         """
         Calculates free memory available.
@@ -63,14 +106,47 @@ class VM:
                 self.free_memory() >= task.memory_demand):
             self.memory_usage += task.memory_demand
             self.tasks.append(task)
+            self._track_tasks([task])
             allocated = True
-            self.total_executed_time += task.execution_time
         
         self.show_cpu_utilization()
         return allocated
     
+    def allocate_tasks_bulk(self, cpu_demands, execution_time):
+        """
+        Allocates a batch of tasks to this VM in order, skipping tasks that do not fit.
+
+        Tasks are accepted greedily exactly as repeated `allocate_task` calls would. The
+        leading run of tasks that fits is found with a single cumulative sum, only the
+        remaining tail is checked task by task.
+
+        Args:
+            cpu_demands (np.ndarray): CPU demand of each task, in allocation order.
+            execution_time (float): Base execution time passed to each Task.
+
+        Returns:
+            int: Number of tasks that were allocated.
+        """
+        cpu_demands = np.asarray(cpu_demands, dtype=float)
+        free_cpu = self.free_cpu_percent()
+        num_fitting = int(np.searchsorted(np.cumsum(cpu_demands), free_cpu, side="right"))
+        accepted = cpu_demands[:num_fitting].tolist()
+        free_cpu -= sum(accepted)
+        for cpu_demand in cpu_demands[num_fitting:].tolist():
+            if cpu_demand <= free_cpu:
+                accepted.append(cpu_demand)
+                free_cpu -= cpu_demand
+
+        new_tasks = [Task(cpu_demand, execution_time=execution_time) for cpu_demand in accepted]
+        self.tasks.extend(new_tasks)
+        self._track_tasks(new_tasks)
+
+        self.show_cpu_utilization()
+        return len(new_tasks)
+
     def show_cpu_utilization(self):
-        print("vm", self.vm_id, self.cpu_usage_percent())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("vm %s %s", self.vm_id, self.cpu_usage_percent())
 
     def monitor_resources(self):
         """
@@ -79,7 +155,7 @@ class VM:
         Returns:
             dict: Dictionary with resource usage details.
         """
-        cpu_usage = sum(task.cpu_demand for task in self.tasks if not task.is_complete())
+        cpu_usage = self.cpu_usage_percent()
         memory_usage = self.memory_usage
         return {
             "vm_id": self.vm_id,
@@ -92,15 +168,12 @@ class VM:
     
     def calculate_makespan(self):
         """
-        Calculates the makespan of tasks running on this VM.
+        Calculates the makespan of tasks allocated to this VM.
 
         Returns:
             float: Maximum end time of all tasks.
         """
-        max_end_time = 0
-        for task in self.tasks:
-            max_end_time = max(max_end_time, task.end_time)
-        return max_end_time
+        return self._end_time
 
     def calculate_makespan2(self):
         """
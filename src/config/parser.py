@@ -1,4 +1,10 @@
-import json
+try:
+    import orjson as json_backend
+except ImportError:  # Fall back to ujson, then to the standard library parser
+    try:
+        import ujson as json_backend
+    except ImportError:
+        import json as json_backend
 
 class ConfigParser:
     """
@@ -14,6 +20,7 @@ class ConfigParser:
         """
         self.config_file = config_file
         self.config = self._load_config()
+        self._flat = self._flatten(self.config)
 
     def _load_config(self):
         """
@@ -23,13 +30,33 @@ class ConfigParser:
             dict: Parsed configuration data.
         """
         try:
-            with open(self.config_file, "r") as file:
-                return json.load(file)
+            with open(self.config_file, "rb") as file:
+                return json_backend.loads(file.read())
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file '{self.config_file}' not found.")
-        except json.JSONDecodeError as e:
+        except ValueError as e:  # JSONDecodeError of every backend is a ValueError
             raise ValueError(f"Error parsing JSON configuration file: {e}")
 
+    @staticmethod
+    def _flatten(config, prefix=""):
+        """
+        Indexes every value of the configuration by its dot-separated key path.
+
+        Args:
+            config (dict): Configuration (sub)tree to index.
+            prefix (str): Key path of `config` within the full configuration.
+
+        Returns:
+            dict: Mapping of key paths to values, including intermediate subtrees.
+        """
+        flat = {}
+        for key, value in config.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(ConfigParser._flatten(value, f"{path}."))
+        return flat
+
     def get(self, key, default=None):
         """
         Retrieves a configuration value.
@@ -41,14 +68,7 @@ class ConfigParser:
         Returns:
             Any: Configuration value or the default value.
         """
-        keys = key.split(".")
-        value = self.config
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except KeyError:
-            return default
+        return self._flat.get(key, default)
         
     def as_dict(self):
         """
@@ -56,13 +76,17 @@ class ConfigParser:
         """
         return self.config
     
+    @staticmethod
     def get_config():
-        # Load configuration
+        # Load configuration on first access
+        if _config_instance is None:
+            return init_config()
         return _config_instance
     
+    @staticmethod
     def get_config_dict():
-        # Load configuration
-        return _config_instance.as_dict()
+        # Load configuration on first access
+        return ConfigParser.get_config().as_dict()
     
 def init_config(config_file="config.json"):
     """
@@ -87,4 +111,4 @@ def init_config(config_file="config.json"):
     return _config_instance
 
 
-_config_instance = ConfigParser("config.json")
\ No newline at end of file
+_config_instance = None
\ No newline at end of file
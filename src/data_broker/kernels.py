@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.numba_support import njit
+
+
+@njit(cache=True, fastmath=True)
+def sum_by_vm(demand, vm_idx, n_vms):
+    """
+    Sums the CPU demand of the running tasks per VM.
+
+    Args:
+        demand (np.ndarray): CPU demand of each running task.
+        vm_idx (np.ndarray): Index of the VM running each task.
+        n_vms (int): Number of VMs.
+
+    Returns:
+        np.ndarray: Total CPU demand of each VM.
+    """
+    out = np.zeros(n_vms)
+    for i in range(demand.shape[0]):
+        out[vm_idx[i]] += demand[i]
+    return out
+
+
+@njit(cache=True)
+def compact(end, vm_idx, task_id, demand, now):
+    """
+    Moves the tasks still running at `now` to the front of the arrays, in place.
+
+    Args:
+        end (np.ndarray): End time of each task.
+        vm_idx (np.ndarray): Index of the VM running each task.
+        task_id (np.ndarray): ID of each task.
+        demand (np.ndarray): CPU demand of each task.
+        now (float): Current time.
+
+    Returns:
+        int: Number of tasks kept, the valid prefix of each array.
+    """
+    w = 0
+    for i in range(end.shape[0]):
+        if end[i] > now:
+            end[w] = end[i]
+            vm_idx[w] = vm_idx[i]
+            task_id[w] = task_id[i]
+            demand[w] = demand[i]
+            w += 1
+    return w
@@ -1,18 +1,28 @@
+import asyncio
+import csv
+import logging
+import multiprocessing
+import queue
 import time
-import threading
-import json
 import os
-import pandas as pd
+import numpy as np
 from src.config.parser import ConfigParser
-from src.data_broker.task_queue import TaskQueue
-from src.data_broker.task_monitor import TaskMonitor
-from src.cloud.task import Task
-from src.cloud.pm import PM
+from src.data_broker.task_monitor import run_task_monitor
 from src.cloud.vm import VM
 from src.algorithms.metaheuristic.pco import PlantCompetitionOptimization
 from src.algorithms.metaheuristic.pso import ParticleSwarmOptimization
 from src.algorithms.metaheuristic.gwo import GrayWolfOptimization
 
+logger = logging.getLogger(__name__)
+
+MONITOR_QUEUE_SIZE = 64  # Task batches buffered for the monitor, newer batches are dropped when full
+
+_ALGO_CLASSES = {
+    "PCO": PlantCompetitionOptimization,
+    "PSO": ParticleSwarmOptimization,
+    "GWO": GrayWolfOptimization,
+}
+
 class LoadBalancer:
     """
     LoadBalancer class responsible for distributing tasks among available resources.
@@ -20,13 +30,16 @@ class LoadBalancer:
 
     ENERGY_COEFFICIENT = 1.2  # Energy coefficient (adjust based on your system)
 
-    def __init__(self, task_queue, pm_list, algorithm_config):
+    def __init__(self, task_queue, pm_list, algorithm_config, enable_monitor=None):
         """
         Initializes the LoadBalancer.
 
         Args:
             task_queue (TaskQueue): An instance of TaskQueue to provide tasks.
             pm_list (list): List of PM objects to balance load across.
+            algorithm_config (dict): Configuration of each metaheuristic, keyed by name.
+            enable_monitor (bool, optional): Whether to start the TaskMonitor GUI. Defaults to
+                the `load_balancer.enable_monitor` setting.
         """
         self.task_queue = task_queue
         self.pm_list = pm_list
@@ -34,18 +47,24 @@ class LoadBalancer:
         self.vms = []
         for pm in self.pm_list:
             self.vms.extend(pm.vms)  # Append VMs from the current PM
+
+        # Per-VM state as parallel arrays, refreshed once per batch for the optimizers
+        self.vm_cpu_cores = np.fromiter((vm.cpu_core for vm in self.vms), dtype=np.float32, count=len(self.vms))
+        self.vm_cpu_usage = np.zeros(len(self.vms))
+        self.vm_capacity = np.empty_like(self.vm_cpu_cores)
+        self.vm_executed_time = np.zeros(len(self.vms))
             
-        # Initialize and start TaskMonitor in a separate thread
-        self.task_monitor_thread = threading.Thread(target=self.run_task_monitor)
-        self.task_monitor_thread.daemon = True  # Ensure it exits when the main program exits
-        self.task_monitor_thread.start()
+        # Start the TaskMonitor GUI in its own process, fed once per batch through a queue
+        self.monitor_queue = None
+        self.task_monitor_process = None
+        if enable_monitor is None:
+            enable_monitor = ConfigParser.get_config().get("load_balancer.enable_monitor", True)
+        if enable_monitor:
+            self._start_monitor()
             
         self.algorithm_config = algorithm_config
-        self.algorithms = {
-            "PCO": PlantCompetitionOptimization(algorithm_config["PCO"]),
-            "PSO": ParticleSwarmOptimization(algorithm_config["PSO"]),
-            "GWO": GrayWolfOptimization(algorithm_config["GWO"]),
-        }
+        self._batch_size = {name: config["batch_size"] for name, config in algorithm_config.items()}
+        self._algo_cache = {}  # Algorithm instances, built on first use
         
         self.metrics = {
             "makespan": [],
@@ -56,6 +75,48 @@ class LoadBalancer:
             "energy_consumption": []  # New metric for energy consumption
         }
         self.start_time = None
+        self._dirs_created = set()  # Result directories already created by save_metrics
+
+    def _start_monitor(self):
+        """
+        Starts the TaskMonitor process and the bounded queue feeding it.
+
+        The monitor is optional, a failure to start it is logged and the load balancer runs
+        without it.
+        """
+        context = multiprocessing.get_context("spawn")
+        monitor_queue = context.Queue(MONITOR_QUEUE_SIZE)
+        # Never block interpreter exit on batches the monitor will not read
+        monitor_queue.cancel_join_thread()
+        process = context.Process(target=run_task_monitor, args=(self.vms, monitor_queue, 25), daemon=True)
+        try:
+            process.start()
+        except OSError as e:
+            logger.warning("Task monitor could not be started: %s", e)
+            monitor_queue.close()
+            return
+        self.monitor_queue = monitor_queue
+        self.task_monitor_process = process
+
+    def _send_to_monitor(self, batch):
+        """
+        Sends a batch of allocated tasks to the TaskMonitor without blocking.
+
+        Batches are dropped while the queue is full. Once the monitor process has exited,
+        for example because its window was closed, the monitor is detached.
+
+        Args:
+            batch (list): (vm_id, task_id, cpu_demand, end_time) tuples.
+        """
+        if not self.task_monitor_process.is_alive():
+            logger.warning("Task monitor exited, no longer sending tasks to it")
+            self.monitor_queue.close()
+            self.monitor_queue = None
+            return
+        try:
+            self.monitor_queue.put_nowait(batch)
+        except queue.Full:
+            pass  # The monitor is behind, it only shows the latest tasks anyway
 
     def collect_metrics(self, results):
         """
@@ -68,22 +129,22 @@ class LoadBalancer:
         self.metrics["tasks_executed"].append(results.get("tasks_executed", 0))
         self.metrics["energy_consumption"].append(results.get("energy_consumption", 0))  # Collect energy consumption
 
-    def calculate_metrics(self, tasks, vm_list, start_time, end_time, sla_failed_count, avg_loop_time, avg_optimize_time):
+    def calculate_metrics(self, total_tasks, vm_list, start_time, end_time, sla_failed_count, avg_loop_time, avg_optimize_time):
         """
         Calculates metrics for the current load balancing execution.
 
         Args:
-            tasks (list): List of tasks processed.
-            vm_list (list): List of VM instances.
+            total_tasks (int): Number of tasks processed.
+            vm_list (list): List of VM instances, in the same order as `self.vms`.
             start_time (float): Start time of the execution.
             end_time (float): End time of the execution.
 
         Returns:
             dict: Calculated metrics.
         """
-        total_tasks = len(tasks)
-        makespan = max(vm.calculate_makespan2() for vm in vm_list)  # Max end time of tasks
-        cpu_utilization = sum(vm.cpu_usage_percent() for vm in vm_list) / len(vm_list)  # Average CPU usage
+        self.vm_cpu_usage[:] = [vm.cpu_usage_percent() for vm in vm_list]
+        makespan = float((self.vm_executed_time / self.vm_cpu_cores).max())  # Same as max of calculate_makespan2
+        cpu_utilization = float(self.vm_cpu_usage.mean())  # Average CPU usage
         execution_time = end_time - start_time
 
         # Calculate energy consumption
@@ -101,13 +162,6 @@ class LoadBalancer:
             "avg_optimize_time": avg_optimize_time
         }
 
-    def run_task_monitor(self):
-        """
-        Starts the TaskMonitor GUI in a separate thread.
-        """
-        task_monitor = TaskMonitor(vms=self.vms, update_interval=25)  # Pass data queue
-        task_monitor.run()
-
     def save_metrics(self, algorithm_name, metrics):
         """
         Save collected metrics to a CSV file.
@@ -116,34 +170,67 @@ class LoadBalancer:
             algorithm_name (str): Name of the algorithm.
             metrics (dict): Metrics collected during load balancing.
         """
-        # Create directory for saving results
-        os.makedirs(f"data/results/{algorithm_name}/", exist_ok=True)
+        # Create directory for saving results, once per algorithm
+        if algorithm_name not in self._dirs_created:
+            os.makedirs(f"data/results/{algorithm_name}/", exist_ok=True)
+            self._dirs_created.add(algorithm_name)
 
-        # Convert metrics dictionary to a DataFrame
-        df = pd.DataFrame([metrics])  # Wrap in a list to ensure correct DataFrame format
-        
         # Define the file path
         filename = f"data/results/{algorithm_name}/metrics_{algorithm_name}.csv"
-        
-        # Save DataFrame to CSV
-        df.to_csv(filename, index=False)
+
+        # Write the header and the single row of metrics
+        with open(filename, "w", newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(metrics.keys())
+            writer.writerow(metrics.values())
         
         # Confirmation message
         print(f"Metrics saved to {filename}")
 
-    def balance_load(self, algorithm_name):
+    def _get_algorithm(self, name):
+        """
+        Returns the instance of the named algorithm, constructing it on first use.
+
+        Args:
+            name (str): Name of the algorithm.
+
+        Returns:
+            Metaheuristic: Cached algorithm instance.
+
+        Raises:
+            ValueError: If no algorithm is registered under `name`.
+        """
+        algorithm = self._algo_cache.get(name)
+        if algorithm is None:
+            try:
+                algorithm_class = _ALGO_CLASSES[name]
+            except KeyError:
+                raise ValueError(f"Algorithm '{name}' not found.") from None
+            algorithm = self._algo_cache[name] = algorithm_class(self.algorithm_config[name])
+        return algorithm
+
+    async def balance_load(self, algorithm_name):
         """
         Balances the load using the specified algorithm.
 
+        The optimization runs in a worker thread and the pacing delay is an asyncio sleep,
+        so the event loop stays free between batches.
+
         Args:
             algorithm_name (str): Name of the algorithm to use for optimization.
         """
-        if algorithm_name not in self.algorithms:
-            raise ValueError(f"Algorithm '{algorithm_name}' not found.")
-        
+        algorithm = self._get_algorithm(algorithm_name)
+
         conf = ConfigParser.get_config_dict()
+        cpu_period = conf["task_queue"]["cpu_utilization_period"]
+        batch_delay = conf["task_queue"]["task_batch_delay"]
 
-        algorithm = self.algorithms[algorithm_name]
+        batch_size = self._batch_size[algorithm_name]
+        vms = self.vms
+        vm_cpu_cores = self.vm_cpu_cores
+        vm_cpu_usage = self.vm_cpu_usage
+        vm_capacity = self.vm_capacity
+        vm_executed_time = self.vm_executed_time
 
         # Process tasks from the task queue
         self.start_time = time.time()
@@ -151,38 +238,60 @@ class LoadBalancer:
         loop_count = 0
         sla_failed_count = 0
 
-        all_tasks = []  # Collect all tasks processed
-        for file_name, tasks in self.task_queue.stream_work_load(self.algorithm_config[algorithm_name]["batch_size"]):
+        total_tasks = 0  # Count of all tasks processed
+        next_tick = time.monotonic() + batch_delay
+        for file_name, tasks in self.task_queue.stream_work_load(batch_size):
             loop_start_time = time.time()
-            print(f"Processing tasks from file: {file_name}")
-            all_tasks.extend(tasks)  # Add to the total task list
+            logger.info("Processing tasks from file: %s", file_name)
+            total_tasks += len(tasks)
+
+            # Snapshot the free capacity of every VM in one vectorized pass
+            vm_cpu_usage[:] = [vm.cpu_usage_percent() for vm in vms]
+            np.subtract(VM.max_cpu_utilization, vm_cpu_usage, out=vm_capacity)
+            vm_capacity *= vm_cpu_cores
 
             # Run the optimization algorithm
             optimize_start_time = time.time()
-            best_allocation = algorithm.optimize(tasks, self.vms)
+            best_allocation = await asyncio.to_thread(algorithm.parallel_optimize, tasks, vms, vm_capacity)
             optimize_end_time = time.time()
             total_optimize_time = total_optimize_time + (optimize_end_time - optimize_start_time)
 
-            # Display task-to-VM allocation
-            for task_cpu, vm_idx in zip(tasks, best_allocation):
-                vm = self.vms[vm_idx]
-                task = Task(task_cpu, execution_time=conf["task_queue"]["cpu_utilization_period"])
-                allocated = vm.allocate_task(task)
-                if not allocated:
-                    sla_failed_count = sla_failed_count + 1
-                print(f"Task{task.task_id} {task_cpu} assigned to VM {vm.vm_id}", f"allocated {allocated}")
+            # Allocate the batch VM by VM, keeping the task order within each VM
+            tasks_cpu = np.asarray(tasks, dtype=float)
+            best_allocation = np.asarray(best_allocation)
+            order = np.argsort(best_allocation, kind="stable")
+            vm_indices, counts = np.unique(best_allocation[order], return_counts=True)
+            vm_groups = np.split(tasks_cpu[order], np.cumsum(counts)[:-1])
+            batch_allocated = 0
+            monitor_batch = []
+            for vm_idx, cpu_demands in zip(vm_indices, vm_groups):
+                vm = vms[vm_idx]
+                allocated = vm.allocate_tasks_bulk(cpu_demands, cpu_period)
+                batch_allocated += allocated
+                vm_executed_time[vm_idx] = vm.total_executed_time
+                if self.monitor_queue is not None and allocated:
+                    monitor_batch.extend(
+                        (vm.vm_id, task.task_id, task.cpu_demand, task.end_time)
+                        for task in vm.tasks[-allocated:]
+                    )
+            if monitor_batch:
+                self._send_to_monitor(monitor_batch)
+            sla_failed_count += len(tasks_cpu) - batch_allocated
+            logger.info("Allocated %d/%d tasks from %s", batch_allocated, len(tasks_cpu), file_name)
 
             loop_end_time = time.time()
             loop_time = loop_end_time - loop_start_time
             # total_loop_time += loop_time
             loop_count += 1
-            time.sleep(conf["task_queue"]["task_batch_delay"])  # Simulate processing delay
+            # Simulate processing delay, counting the time the batch already took
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            next_tick += batch_delay
 
         # Calculate final metrics
         end_time = time.time()
         avg_loop_time = (end_time-self.start_time) / loop_count
         avg_optimize_time = total_optimize_time / loop_count
-        metrics = self.calculate_metrics(all_tasks, self.vms, self.start_time, end_time, sla_failed_count, avg_loop_time, avg_optimize_time)
+        metrics = self.calculate_metrics(total_tasks, vms, self.start_time, end_time, sla_failed_count, avg_loop_time, avg_optimize_time)
         self.collect_metrics(metrics)
         self.save_metrics(algorithm_name=algorithm_name, metrics=metrics)
         print(f"Load balancing completed using {algorithm_name}. Metrics: {metrics}")
@@ -1,28 +1,65 @@
 # manager.py
-from src.config.parser import ConfigParser
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config.parser import ConfigParser, init_config
 from src.cloud.datacenter import Datacenter
-from src.cloud.pm import PM
-from src.cloud.vm import VM
-from src.cloud.task import Task
 
 from src.data_broker.task_queue import TaskQueue
 from src.data_broker.load_balancer import LoadBalancer
 
+def run_algorithm(config_file, algorithm_name):
+    """
+    Runs one algorithm on a freshly built datacenter, used as a worker process entry point.
+
+    Args:
+        config_file (str): Path to the JSON configuration file.
+        algorithm_name (str): Name of the algorithm to run.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # Spawned workers start unconfigured
+    init_config(config_file)
+    conf = ConfigParser.get_config_dict()
+    datacenter = Datacenter(conf["datacenter"])
+    task_queue = TaskQueue(conf["task_queue"]["directory"])
+    load_balancer = LoadBalancer(task_queue, datacenter.pms, conf["metaheuristics"], enable_monitor=False)
+    asyncio.run(load_balancer.balance_load(algorithm_name=algorithm_name))
+
+
 class DataBrokerManager:
-    def __init__(self, datacenter):
+    def __init__(self, datacenter, enable_monitor=None):
         self.datacenter = datacenter
         
-        
-        # Load TaskQueue
-        task_queue_dir = ConfigParser.get_config_dict()["task_queue"]["directory"]
-        self.task_queue = TaskQueue(task_queue_dir)
-        
         conf = ConfigParser.get_config_dict()
-        algorithm_config = conf["metaheuristics"]
-        self.load_balancer = LoadBalancer(self.task_queue, self.datacenter.pms, algorithm_config)
+        self.algorithm_names = conf["load_balancer"].get("algorithms") or [conf["load_balancer"]["default_algorithm"]]
+
+        # Several algorithms each build their own queue and datacenter in a worker process
+        self.task_queue = None
+        self.load_balancer = None
+        if len(self.algorithm_names) == 1:
+            # Load TaskQueue
+            task_queue_dir = conf["task_queue"]["directory"]
+            self.task_queue = TaskQueue(task_queue_dir)
+
+            algorithm_config = conf["metaheuristics"]
+            self.load_balancer = LoadBalancer(self.task_queue, self.datacenter.pms, algorithm_config, enable_monitor)
     
     def start(self):
-        loadbalancer_config = ConfigParser.get_config_dict()
-        # Run load balancing with metaheuristic algorithms from config
-        # for algorithm_name in []:
-        self.load_balancer.balance_load(algorithm_name=loadbalancer_config["load_balancer"]["default_algorithm"])
+        asyncio.run(self.start_async())
+
+    async def start_async(self):
+        # A single algorithm runs in this process, on this datacenter
+        if len(self.algorithm_names) == 1:
+            await self.load_balancer.balance_load(algorithm_name=self.algorithm_names[0])
+            return
+
+        # Several algorithms run concurrently, one worker process each, without the monitor.
+        # They share the CPUs, so their timing metrics are not comparable to solo runs.
+        loop = asyncio.get_running_loop()
+        config_file = ConfigParser.get_config().config_file
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(self.algorithm_names), mp_context=context) as executor:
+            await asyncio.gather(
+                *(loop.run_in_executor(executor, run_algorithm, config_file, name) for name in self.algorithm_names)
+            )
@@ -1,46 +1,81 @@
-import tkinter as tk
-from tkinter import ttk
+import logging
+import queue
 import time
 
+import numpy as np
+
+from src.data_broker import kernels
+from src.numba_support import NUMBA_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
 
 class TaskMonitor:
     """
     Task monitoring GUI displaying running tasks on each VM and CPU utilization summary.
     This class does not allocate, remove, or schedule tasks, it simply monitors them.
+
+    The monitor runs in its own process. It never reads the load balancer's VMs directly,
+    newly allocated tasks arrive in batches through `snapshot_queue` and are dropped once
+    their end time has passed. End times are `time.monotonic()` values, the clock is shared
+    by all processes on the host.
     """
 
-    def __init__(self, vms, update_interval=300):
+    def __init__(self, vms, snapshot_queue, update_interval=300):
         """
-        Initializes the TaskMonitor GUI with real VM data.
+        Initializes the TaskMonitor GUI.
 
         Args:
-            vms (list): List of VM objects.
+            vms (list): List of VM objects, used for their IDs and PM placement.
+            snapshot_queue (multiprocessing.Queue): Queue of allocated task batches, each a list
+                of (vm_id, task_id, cpu_demand, end_time) tuples.
             update_interval (int): Update interval in milliseconds for real-time updates.
         """
-        self.vms = vms  # List of actual VM objects
+        # Tk is only needed once the GUI starts, so headless runs never import it
+        import tkinter as tk
+        from tkinter import ttk
+        self._tk = tk
+        self._ttk = ttk
+
+        self.vms = vms
+        self.snapshot_queue = snapshot_queue
         self.update_interval = update_interval
+        self.max_update_interval = max(update_interval, 2000)  # Slowest refresh rate while idle
+        self._interval = update_interval  # Delay before the next refresh
+        self._dirty = True  # Whether running tasks changed since the last refresh
+        self._total_tasks = 0  # Number of running tasks across all VMs
+
+        # Running tasks as flat arrays in arrival order, grouped per VM only when displayed
+        self.vm_index = {vm.vm_id: i for i, vm in enumerate(self.vms)}
+        self.vm_idx_arr = np.empty(0, dtype=np.int32)
+        self.task_id_arr = np.empty(0, dtype=np.int64)
+        self.demand_arr = np.empty(0)
+        self.end_time_arr = np.empty(0)
+        self._cell_text = {}  # Task ID -> table cell text of the displayed tasks, formatted once
+        self.vm_utilization = np.zeros(len(self.vms))
+        self.cpu_utilization_arr = np.zeros(len(self.vms))  # Displayed VM utilization in percent, capped at 100
 
         # Tkinter setup
-        self.root = tk.Tk()
+        self.root = self._tk.Tk()
         self.root.title("Task Monitoring")
         self.root.geometry("1200x700")
 
         # Frame for PM utilization summary
-        self.pm_utilization_frame = tk.Frame(self.root)
-        self.pm_utilization_frame.pack(fill=tk.X, pady=5)
+        self.pm_utilization_frame = self._tk.Frame(self.root)
+        self.pm_utilization_frame.pack(fill=self._tk.X, pady=5)
 
         # PM utilization labels
         self.pm_utilization_labels = {}
         for vm in self.vms:
             pm_id = vm.pm_id
             if pm_id not in self.pm_utilization_labels:
-                label = tk.Label(self.pm_utilization_frame, text=f"PM {pm_id}: 0.00%", width=20, anchor="w")
-                label.pack(side=tk.LEFT, padx=5)
+                label = self._tk.Label(self.pm_utilization_frame, text=f"PM {pm_id}: 0.00%", width=20, anchor="w")
+                label.pack(side=self._tk.LEFT, padx=5)
                 self.pm_utilization_labels[pm_id] = label
 
         # Treeview setup
-        self.tree = ttk.Treeview(self.root)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree = self._ttk.Treeview(self.root)
+        self.tree.pack(fill=self._tk.BOTH, expand=True)
 
         # Define columns dynamically for each VM
         self.columns = [f"{vm.vm_id}" for vm in self.vms]
@@ -52,25 +87,29 @@ class TaskMonitor:
         for col in self.columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=20, anchor="center")
+        self.tree.configure(displaycolumns=self.columns)
+        self.row_iids = []  # Treeview items of the displayed rows, reused across updates
+        self.row_values = []  # Cell texts currently shown in each row
 
         # Frame for CPU utilization summary
-        self.utilization_frame = tk.Frame(self.root)  # Use Frame for multi-line CPU utilization
-        self.utilization_frame.pack(fill=tk.X, pady=10)  # Add vertical padding here to keep things close
+        self.utilization_frame = self._tk.Frame(self.root)  # Use Frame for multi-line CPU utilization
+        self.utilization_frame.pack(fill=self._tk.X, pady=10)  # Add vertical padding here to keep things close
 
         # CPU utilization labels
         self.utilization_labels = {}
-        self.row_count = 0  # Keep track of the rows for the labels
+        self.util_vars = {vm.vm_id: self._tk.StringVar(value=f"{vm.vm_id}: 0.00%") for vm in self.vms}
+        self._last_util = {vm.vm_id: -1 for vm in self.vms}  # Last utilization shown by each label
+        labels_per_row = 5
 
-        for vm in self.vms:
-            # Create a new label for each VM's CPU usage in a separate row
-            if self.row_count % 5 == 0:
-                self.utilization_row_frame = tk.Frame(self.utilization_frame)
-                self.utilization_row_frame.pack(fill=tk.X)
-
-            label = tk.Label(self.utilization_row_frame, text=f"{vm.vm_id}: 0.00%", width=20, anchor="w")
-            label.pack(side=tk.LEFT, padx=5)
+        # Lay the labels out in a single grid instead of one packed frame per row
+        for i, vm in enumerate(self.vms):
+            label = self._tk.Label(
+                self.utilization_frame, textvariable=self.util_vars[vm.vm_id], width=20, anchor="w"
+            )
+            label.grid(row=i // labels_per_row, column=i % labels_per_row, padx=5, sticky="w")
             self.utilization_labels[vm.vm_id] = label
-            self.row_count += 1
+        for column in range(min(labels_per_row, len(self.vms))):
+            self.utilization_frame.grid_columnconfigure(column, weight=1)
 
         # Start the periodic updates
         self.update_table()
@@ -78,19 +117,19 @@ class TaskMonitor:
     def calculate_pm_utilization(self):
         """
         Calculates the overall utilization for each PM by aggregating the CPU usage
-        of all VMs hosted on the PM.
+        of all VMs hosted on the PM, as last computed by `calculate_cpu_utilization`.
 
         Returns:
             dict: A dictionary with PM IDs as keys and their utilization as values.
         """
         pm_utilization = {}
         pm_vm_count = {}
-        for vm in self.vms:
+        for vm, vm_utilization in zip(self.vms, self.vm_utilization.tolist()):
             pm_id = vm.pm_id
             if pm_id not in pm_utilization:
                 pm_utilization[pm_id] = 0
-            pm_utilization[pm_id] += sum(task.cpu_demand for task in vm.tasks)
-            
+            pm_utilization[pm_id] += vm_utilization
+
             if pm_id not in pm_vm_count:
                 pm_vm_count[pm_id] = 0
             pm_vm_count[pm_id] += 1
@@ -105,28 +144,136 @@ class TaskMonitor:
             pmu = utilization * 100 / pm_vm_count[pm_id]
             self.pm_utilization_labels[pm_id].config(text=f"PM {pm_id}: {pmu:.2f}%")
 
+    def mark_dirty(self):
+        """
+        Flags the running tasks as changed so the next refresh redraws the GUI.
+        """
+        self._dirty = True
+
+    def receive_tasks(self):
+        """
+        Drains the snapshot queue and records the newly allocated tasks.
+        """
+        while True:
+            try:
+                batch = self.snapshot_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.mark_dirty()
+            self._total_tasks += len(batch)
+            vm_ids, task_ids, cpu_demands, end_times = zip(*batch)
+            self.vm_idx_arr = np.concatenate(
+                (self.vm_idx_arr, np.fromiter(map(self.vm_index.__getitem__, vm_ids), dtype=np.int32))
+            )
+            self.task_id_arr = np.concatenate((self.task_id_arr, np.asarray(task_ids, dtype=np.int64)))
+            self.demand_arr = np.concatenate((self.demand_arr, np.asarray(cpu_demands, dtype=np.float64)))
+            self.end_time_arr = np.concatenate((self.end_time_arr, np.asarray(end_times)))
+
+    def remove_finished_tasks(self):
+        """
+        Drops the tasks whose end time has passed.
+
+        Returns:
+            int: Number of tasks removed.
+        """
+        current_time = time.monotonic()
+        count = len(self.end_time_arr)
+        if NUMBA_AVAILABLE:
+            kept = kernels.compact(
+                self.end_time_arr, self.vm_idx_arr, self.task_id_arr, self.demand_arr, current_time
+            )
+            self.vm_idx_arr = self.vm_idx_arr[:kept]
+            self.task_id_arr = self.task_id_arr[:kept]
+            self.demand_arr = self.demand_arr[:kept]
+            self.end_time_arr = self.end_time_arr[:kept]
+        else:
+            keep = self.end_time_arr > current_time
+            self.vm_idx_arr = self.vm_idx_arr[keep]
+            self.task_id_arr = self.task_id_arr[keep]
+            self.demand_arr = self.demand_arr[keep]
+            self.end_time_arr = self.end_time_arr[keep]
+        removed = count - len(self.end_time_arr)
+        self._total_tasks -= removed
+        return removed
+
+    def next_update_delay(self):
+        """
+        Computes the delay before the next refresh.
+
+        The refresh rate backs off while nothing changes, but never past the moment the
+        next running task ends, so finished tasks disappear on time.
+
+        Returns:
+            int: Delay in milliseconds.
+        """
+        delay = self._interval
+        if len(self.end_time_arr):
+            next_expiry = float(self.end_time_arr.min())
+            delay = min(delay, max(50, int((next_expiry - time.monotonic()) * 1000)))
+        return delay
+
     def update_table(self):
         """
         Periodically updates the table with running tasks and CPU utilization.
+
+        Refreshes that find no new or finished tasks skip the redraw and double the delay
+        before the next one, up to `max_update_interval`.
         """
-        # Clear the current table
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        # Add running tasks to the table
-        max_rows = max(len(vm.tasks) for vm in self.vms) if self.vms else 0  # Get max task count across all VMs
-        for i in range(max_rows):
-            row_values = []
-            for vm in self.vms:
-                if i < len(vm.tasks):
-                    task = vm.tasks[i]
-                    cpud = vm.tasks[i].cpu_demand * 100
-                    val = f"t{task.task_id:5d}  %{cpud:05.2f}"
-                    row_values.append(val)  # Add task ID from each VM
-                else:
-                    row_values.append("")  # No task for this row in this VM
-
-            self.tree.insert("", "end", text=f"{i+1}", values=row_values)
+        self.receive_tasks()
+        if self.remove_finished_tasks():
+            self.mark_dirty()
+        if not self._dirty:
+            self._interval = min(self._interval * 2, self.max_update_interval)
+            self.root.after(self.next_update_delay(), self.update_table)
+            return
+        self._dirty = False
+        self._interval = self.update_interval
+
+        # Apply all widget changes in one idle callback so Tk lays out and redraws once
+        self.root.after_idle(self._commit)
+
+    def _commit(self):
+        """
+        Writes the running tasks and utilization summaries to the widgets, then flushes
+        the pending redraws and schedules the next refresh.
+        """
+        # Group the running tasks by VM, keeping their arrival order within each VM
+        counts = np.bincount(self.vm_idx_arr, minlength=len(self.vms)).tolist()
+        order = np.argsort(self.vm_idx_arr, kind="stable")
+        task_ids = self.task_id_arr[order].tolist()
+        demands = self.demand_arr[order].tolist()
+        cell_text = {}
+        columns = []
+        start = 0
+        for count in counts:
+            column = []
+            for task_id, cpu_demand in zip(task_ids[start:start + count], demands[start:start + count]):
+                text = self._cell_text.get(task_id)
+                if text is None:
+                    text = f"t{task_id:5d}  %{cpu_demand * 100:05.2f}"
+                cell_text[task_id] = text
+                column.append(text)
+            columns.append(column)
+            start += count
+        self._cell_text = cell_text  # Texts of finished tasks are dropped here
+
+        # Grow or shrink the table to the max task count across all VMs
+        max_rows = max(counts, default=0)
+        empty_row = ("",) * len(self.columns)
+        while len(self.row_iids) < max_rows:
+            row = len(self.row_iids)
+            self.row_iids.append(self.tree.insert("", "end", text=f"{row+1}", values=empty_row))
+            self.row_values.append(empty_row)
+        while len(self.row_iids) > max_rows:
+            self.tree.delete(self.row_iids.pop())
+            self.row_values.pop()
+
+        # Only send the rows that changed since the last update to Tk, one call per row
+        for i, iid in enumerate(self.row_iids):
+            values = tuple(column[i] if i < len(column) else "" for column in columns)
+            if values != self.row_values[i]:
+                self.tree.item(iid, values=values)
+                self.row_values[i] = values
 
         # Update CPU utilization for each VM
         self.calculate_cpu_utilization()
@@ -134,24 +281,60 @@ class TaskMonitor:
         # Update PM utilization
         self.update_pm_utilization()
 
+        self.root.update_idletasks()
+
         # Schedule the next update
-        self.root.after(self.update_interval, self.update_table)
+        self.root.after(self.next_update_delay(), self.update_table)
 
     def calculate_cpu_utilization(self):
         """
         Calculates and updates the CPU utilization for each VM.
         Here we simply sum the exact CPU demand of the tasks assigned to each VM.
         """
-        for vm in self.vms:
-            # Calculate CPU utilization by summing CPU demands of all tasks in the VM
-            total_cpu_usage = sum(task.cpu_demand for task in vm.tasks)  # Directly use the task's cpu_demand
+        # Nothing runs and the labels already show 0%, skip the update entirely
+        if self._total_tasks == 0 and not self.vm_utilization.any():
+            return
+
+        # Sum the CPU demands of the running tasks per VM in one pass
+        if NUMBA_AVAILABLE:
+            self.vm_utilization = kernels.sum_by_vm(self.demand_arr, self.vm_idx_arr, len(self.vms))
+        else:
+            self.vm_utilization = np.bincount(self.vm_idx_arr, weights=self.demand_arr, minlength=len(self.vms))
+
+        util = self.cpu_utilization_arr
+        np.multiply(self.vm_utilization, 100.0, out=util)
+        np.minimum(util, 100.0, out=util)
 
+        for vm, total_cpu_usage_percent in zip(self.vms, util.tolist()):
             # Format the utilization to two decimal points
-            total_cpu_usage_percent = total_cpu_usage * 100
-            self.utilization_labels[vm.vm_id].config(text=f"vm{vm.vm_id:2.0f}-{total_cpu_usage_percent:05.2f}%")
+            if total_cpu_usage_percent != self._last_util[vm.vm_id]:
+                self.util_vars[vm.vm_id].set(f"vm{vm.vm_id:2.0f}-{total_cpu_usage_percent:05.2f}%")
+                self._last_util[vm.vm_id] = total_cpu_usage_percent
 
     def run(self):
         """
         Runs the Tkinter main loop.
         """
         self.root.mainloop()
+
+
+def run_task_monitor(vms, snapshot_queue, update_interval=300):
+    """
+    Entry point of the task monitor process.
+
+    Args:
+        vms (list): List of VM objects to display.
+        snapshot_queue (multiprocessing.Queue): Queue of allocated task batches.
+        update_interval (int): Update interval in milliseconds.
+    """
+    try:
+        import tkinter
+    except ImportError as e:
+        logger.error("Task monitor needs tkinter: %s", e)
+        return
+    try:
+        monitor = TaskMonitor(vms, snapshot_queue, update_interval)
+    except tkinter.TclError as e:  # No display available
+        logger.error("Task monitor could not open its window: %s", e)
+        return
+    monitor.run()
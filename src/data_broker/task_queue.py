@@ -1,6 +1,64 @@
 # src/data_broker/task_queue.py
 
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+READ_BUFFER_SIZE = 1 << 18  # 256 KiB, trace files are read in a few large syscalls
+PYARROW_MIN_FILE_SIZE = 16 << 20  # 16 MiB, smaller files parse faster with NumPy than pyarrow loads
+
+
+@lru_cache(maxsize=None)
+def _pyarrow_csv():
+    """
+    Imports the optional pyarrow CSV reader on first use.
+
+    Returns:
+        module: `pyarrow.csv`, or None if pyarrow is not installed.
+    """
+    try:
+        import pyarrow.csv as pac
+    except ImportError:
+        return None
+    return pac
+
+
+def read_values(asset_file):
+    """
+    Reads all numeric values of an asset file.
+
+    Args:
+        asset_file (str): Path to the asset file.
+
+    Returns:
+        np.ndarray: Values of the file, in file order.
+
+    Raises:
+        ValueError: If the file contains a value that is not a number.
+    """
+    size = os.path.getsize(asset_file)
+    if size == 0:
+        return np.empty(0)
+
+    # Only very large files amortize importing pyarrow and its C tokenizer
+    pac = _pyarrow_csv() if size >= PYARROW_MIN_FILE_SIZE else None
+    if pac is not None:
+        import pyarrow as pa
+        table = pac.read_csv(
+            asset_file,
+            read_options=pac.ReadOptions(column_names=["v"]),
+            convert_options=pac.ConvertOptions(column_types={"v": pa.float64()}),
+        )
+        return table.column("v").to_numpy()
+
+    with open(asset_file, "r", buffering=READ_BUFFER_SIZE) as file:
+        return np.loadtxt(file, dtype=np.float64, ndmin=1)
+
 
 class TaskQueue:
     """
@@ -21,26 +79,60 @@ class TaskQueue:
         """
         Reads all files in the given directory and loads tasks.
 
+        Files are parsed in parallel threads, NumPy releases the GIL while converting the
+        values. Tasks are added in directory order regardless of which parse finishes first.
+
         Args:
             directory (str): Path to the directory containing asset files.
         """
         if not os.path.exists(directory) or not os.path.isdir(directory):
             raise FileNotFoundError(f"Directory '{directory}' not found or invalid.")
 
-        for file_name in os.listdir(directory):
-            file_path = os.path.join(directory, file_name)
-            if os.path.isfile(file_path):
-                self.read_file(file_name, file_path)
+        with os.scandir(directory) as it:
+            entries = [(entry.name, entry.path) for entry in it if entry.is_file()]
+        if not entries:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(len(entries), os.cpu_count() or 1)) as executor:
+            results = executor.map(self.parse_file, [file_path for _, file_path in entries])
+            for (file_name, _), file_tasks in zip(entries, results):
+                if len(file_tasks):
+                    self.work_load[file_name] = file_tasks
 
     def read_file(self, file_name, asset_file):
         """
-        Reads a single asset file and adds its contents as a list to the tasks.
+        Reads a single asset file and adds its contents as an array to the tasks.
+
+        Args:
+            file_name (str): Name under which the tasks are stored.
+            asset_file (str): Path to the asset file containing CPU utilizations.
+        """
+        file_tasks = self.parse_file(asset_file)
+        if len(file_tasks):
+            self.work_load[file_name] = file_tasks
+
+    def parse_file(self, asset_file):
+        """
+        Parses an asset file into normalized CPU utilizations.
+
+        The whole file is parsed in one call by `read_values`. Files with malformed lines fall
+        back to a line by line parse that skips and reports the invalid values.
 
         Args:
             asset_file (str): Path to the asset file containing CPU utilizations.
+
+        Returns:
+            np.ndarray: CPU utilizations above zero, divided by 100.
         """
-        file_tasks = []
-        with open(asset_file, "r") as file:
+        try:
+            cpu_utilizations = read_values(asset_file)
+        except ValueError:
+            logger.warning("Invalid CPU utilization values in file '%s', parsing line by line", asset_file)
+        else:
+            return cpu_utilizations[cpu_utilizations > 0] / 100
+
+        with open(asset_file, "r", buffering=READ_BUFFER_SIZE) as file:
+            file_tasks = []
             for line in file:
                 try:
                     cpu_utilization = float(line.strip())
@@ -48,13 +140,14 @@ class TaskQueue:
                         file_tasks.append(cpu_utilization/100)
                 except ValueError:
                     print(f"Invalid CPU utilization value in file '{asset_file}': {line.strip()}")
-        if file_tasks:
-            self.work_load[file_name] = file_tasks
+        return np.array(file_tasks)
     
     def stream_work_load(self, batch_size=None):
         """
         Streams the data from the work_load dictionary file by file in batches.
 
+        Batches are views into the parsed arrays, so streaming copies no data.
+
         Args:
             batch_size (int, optional): Number of rows to stream at a time. If None, streams all rows.
 
@@ -65,7 +158,7 @@ class TaskQueue:
             if batch_size is None:
                 yield file_name, rows
             else:
-                for i in range(0, len(rows), batch_size):
+                for i in range(0, rows.shape[0], batch_size):
                     yield file_name, rows[i:i + batch_size]
 
 # Example usage
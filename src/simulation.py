@@ -1,4 +1,6 @@
 # simulation.py
+import asyncio
+
 from src.config.parser import ConfigParser
 from src.cloud.datacenter import Datacenter
 from src.data_broker.manager import DataBrokerManager
@@ -7,13 +9,19 @@ def init_datacenter():
     # dc = Datacenter(5, 20, 2.8*1024, 64, 5)
     config = ConfigParser.get_config()
     dc = Datacenter(config.get("datacenter"))
-    # Datacenter.visualize_datacenter(dc)
+    if config.get("datacenter.visualize", False):  # Plotting is skipped on headless runs
+        Datacenter.visualize_datacenter(dc)
     return dc
     
-def init_data_broker(datacenter):
-    data_broker = DataBrokerManager(datacenter)
-    data_broker.start()
+async def init_data_broker_async(datacenter):
+    # Loading the task queue reads every trace file, keep it off the event loop
+    data_broker = await asyncio.to_thread(DataBrokerManager, datacenter)
+    await data_broker.start_async()
 
-def simulate_loadbalancer():
+async def simulate_loadbalancer_async():
+    # Built on the loop thread, matplotlib must stay on the main thread when visualizing
     datacenter = init_datacenter()
-    init_data_broker(datacenter=datacenter)
\ No newline at end of file
+    await init_data_broker_async(datacenter=datacenter)
+
+def simulate_loadbalancer():
+    asyncio.run(simulate_loadbalancer_async())